@@ -6,11 +6,24 @@
 ###############################################
 
 import pyrealsense2 as rs
+from realsense_common import get_devices
 import sys
 import os
 import time
 import platform
 import subprocess
+import threading
+import queue
+
+# Frame timeouts for the pipeline attempts in Method 3
+QUICK_PROBE_TIMEOUT_MS = 500
+FRAME_TIMEOUT_MS = 5000
+
+# Overall time budget for the Method 4 USB controller probes
+USB_PORT_PROBE_TIMEOUT_S = 2.0
+
+# Separates the two device listings in the combined PowerShell output
+USB_OUTPUT_MARKER = "---INTEL---"
 
 def print_header(text):
     print("\n" + "=" * 50)
@@ -28,27 +41,68 @@ def check_usb_devices():
     
     if platform.system() == 'Windows':
         try:
+            # Query Get-PnpDevice once and print both views from a single
+            # PowerShell process, separated by a marker line
             print("Running PowerShell command to list USB devices...")
             result = subprocess.run(
                 ["powershell", "-Command", 
-                 "Get-PnpDevice | Where-Object {$_.Class -eq 'Camera' -or $_.Class -eq 'Image' -or $_.Class -eq 'USB'} | Format-Table -AutoSize"],
+                 "$d = Get-PnpDevice; "
+                 "$d | Where-Object {$_.Class -eq 'Camera' -or $_.Class -eq 'Image' -or $_.Class -eq 'USB'} | Format-Table -AutoSize; "
+                 f"'{USB_OUTPUT_MARKER}'; "
+                 "$d | Where-Object {$_.FriendlyName -like '*Intel*' -or $_.FriendlyName -like '*RealSense*'} | Format-Table -AutoSize"],
                 capture_output=True, text=True, timeout=10
             )
-            print(result.stdout)
+            usb_devices, _, intel_devices = result.stdout.partition(USB_OUTPUT_MARKER)
+            print(usb_devices)
             
             print("Looking for Intel devices in all USB devices...")
-            result = subprocess.run(
-                ["powershell", "-Command", 
-                 "Get-PnpDevice | Where-Object {$_.FriendlyName -like '*Intel*' -or $_.FriendlyName -like '*RealSense*'} | Format-Table -AutoSize"],
-                capture_output=True, text=True, timeout=10
-            )
-            print(result.stdout)
+            print(intel_devices)
             
         except Exception as e:
             print(f"Error running PowerShell command: {e}")
     else:
         print("USB device check is only supported on Windows")
 
+def enable_config_streams(config, config_settings, verbose=True):
+    """Enable the streams requested in config_settings on an rs.config"""
+    if config_settings.get("depth", False):
+        config.enable_stream(rs.stream.depth, 640, 480, rs.format.z16, 30)
+        if verbose:
+            print("  Enabled depth stream")
+        
+    if config_settings.get("color", False):
+        config.enable_stream(rs.stream.color, 640, 480, rs.format.bgr8, 30)
+        if verbose:
+            print("  Enabled color stream")
+        
+    if config_settings.get("infrared", False):
+        config.enable_stream(rs.stream.infrared, 640, 480, rs.format.y8, 30)
+        if verbose:
+            print("  Enabled infrared stream")
+
+def try_usb_port(i):
+    """Try to start a pipeline hinting at USB controller i, raise on failure"""
+    config = rs.config()
+    # Try with a hint to use a specific USB controller
+    config.enable_device_from_file(None, f"{{'usb_port_id':'{i}'}}")
+    pipeline = rs.pipeline()
+    pipeline.start(config)
+    pipeline.stop()
+
+def probe_usb_ports(ports, done, results):
+    """Probe each USB controller in turn, putting (i, error) on `results`
+
+    error is None on success. Stops before the next probe once `done` is set.
+    """
+    for i in ports:
+        if done.is_set():
+            return
+        try:
+            try_usb_port(i)
+            results.put((i, None))
+        except Exception as e:
+            results.put((i, e))
+
 def main():
     print_header("INTEL REALSENSE ADVANCED DIAGNOSTIC TOOL")
     
@@ -73,8 +127,7 @@ def main():
     # Method 1: Standard Context Query
     print_section("METHOD 1: STANDARD QUERY")
     try:
-        ctx = rs.context()
-        devices = ctx.query_devices()
+        devices = get_devices()
         print(f"Devices found: {len(devices)}")
         for i, dev in enumerate(devices):
             try:
@@ -89,14 +142,11 @@ def main():
     # Method 2: Direct Device Query
     print_section("METHOD 2: DIRECT DEVICE QUERY")
     try:
-        ctx = rs.context()
-        for i in range(10):  # Try different device indices
-            try:
-                dev = ctx.get_sensor(i)
-                print(f"Found device at index {i}")
-                print(f"  Type: {type(dev)}")
-            except:
-                pass
+        # Ask each device for its sensors rather than probing indices blindly
+        for dev in get_devices():
+            for j, sensor in enumerate(dev.query_sensors()):
+                print(f"Found sensor {j}: {sensor.get_info(rs.camera_info.name)}")
+                print(f"  Type: {type(sensor)}")
     except Exception as e:
         print(f"Error in direct device query: {e}")
     
@@ -111,29 +161,29 @@ def main():
         {"infrared": True}
     ]
     
+    # Probe each configuration with a short frame timeout first, and only
+    # fall back to the full timeout when none of them delivers frames in time
+    winner = None
+    candidate = None
+    # One pipeline/config pair is reused for every attempt
+    pipeline = rs.pipeline()
+    config = rs.config()
     for i, config_settings in enumerate(stream_configs):
         print(f"\nAttempt {i+1}: Testing with {config_settings}")
-        pipeline = rs.pipeline()
-        config = rs.config()
+        started = False
         
         try:
             # Configure streams based on settings
-            if config_settings.get("depth", False):
-                config.enable_stream(rs.stream.depth, 640, 480, rs.format.z16, 30)
-                print("  Enabled depth stream")
-                
-            if config_settings.get("color", False):
-                config.enable_stream(rs.stream.color, 640, 480, rs.format.bgr8, 30)
-                print("  Enabled color stream")
-                
-            if config_settings.get("infrared", False):
-                config.enable_stream(rs.stream.infrared, 640, 480, rs.format.y8, 30)
-                print("  Enabled infrared stream")
+            config.disable_all_streams()
+            enable_config_streams(config, config_settings)
             
             # Try starting the pipeline
             print("  Starting pipeline...")
             profile = pipeline.start(config)
+            started = True
             print("  Pipeline started successfully!")
+            if candidate is None:
+                candidate = config_settings
             
             # Get device info
             dev = profile.get_device()
@@ -141,45 +191,76 @@ def main():
             print(f"  Serial number: {dev.get_info(rs.camera_info.serial_number)}")
             
             # Try to get a frame
-            print("  Waiting for frames...")
-            frames = pipeline.wait_for_frames(5000)
+            print(f"  Quick probe: waiting {QUICK_PROBE_TIMEOUT_MS} ms for frames...")
+            frames = pipeline.wait_for_frames(QUICK_PROBE_TIMEOUT_MS)
             print(f"  Received {len(frames)} frames!")
-            
-            # Success - this configuration works
-            print("  ✅ SUCCESS: This configuration works!")
-            pipeline.stop()
-            
-            # If we got here, we have a working configuration
-            print("\n📋 WORKING CONFIGURATION:")
-            print(f"  Depth stream: {config_settings.get('depth', False)}")
-            print(f"  Color stream: {config_settings.get('color', False)}")
-            print(f"  Infrared stream: {config_settings.get('infrared', False)}")
+            winner = config_settings
             break
             
         except Exception as e:
             print(f"  ❌ Failed: {str(e)}")
-            try:
+        finally:
+            # Only stop a pipeline that actually started
+            if started:
+                pipeline.stop()
+    
+    # A configuration that started but was slow to deliver its first frame
+    # still deserves the full timeout, but only when nothing passed the quick
+    # probe. A quick-probe winner takes precedence over an earlier slow starter.
+    if winner is None and candidate is not None:
+        print(f"\nRetrying {candidate} with a {FRAME_TIMEOUT_MS} ms timeout...")
+        started = False
+        
+        try:
+            config.disable_all_streams()
+            enable_config_streams(config, candidate, verbose=False)
+            pipeline.start(config)
+            started = True
+            frames = pipeline.wait_for_frames(FRAME_TIMEOUT_MS)
+            print(f"  Received {len(frames)} frames!")
+            winner = candidate
+            
+        except Exception as e:
+            print(f"  ❌ Failed: {str(e)}")
+        finally:
+            if started:
                 pipeline.stop()
-            except:
-                pass
+    
+    if winner is not None:
+        # Success - this configuration works
+        print("  ✅ SUCCESS: This configuration works!")
+        
+        # If we got here, we have a working configuration
+        print("\n📋 WORKING CONFIGURATION:")
+        print(f"  Depth stream: {winner.get('depth', False)}")
+        print(f"  Color stream: {winner.get('color', False)}")
+        print(f"  Infrared stream: {winner.get('infrared', False)}")
     
     # Method 4: Try to connect with specific attributes
     print_section("METHOD 4: SPECIFIC ATTRIBUTES")
     try:
-        # Try connecting with all possible USB ports/controllers
-        ctx = rs.context()
-        for i in range(10):  # Try multiple USB controllers
-            try:
-                config = rs.config()
-                # Try with a hint to use a specific USB controller
-                config.enable_device_from_file(None, f"{{'usb_port_id':'{i}'}}")
-                pipeline = rs.pipeline()
-                pipeline.start(config)
-                print(f"Success connecting via USB controller {i}")
-                pipeline.stop()
-                break
-            except:
-                pass
+        # Try connecting with all possible USB ports/controllers. librealsense
+        # is not thread-safe when several pipelines open the same device, so
+        # one daemon thread probes them in turn. The caller waits at most one
+        # time budget; a probe stuck inside librealsense is abandoned and
+        # does not keep the script alive at exit.
+        ports = range(10)
+        done = threading.Event()
+        results = queue.Queue()
+        threading.Thread(target=probe_usb_ports, args=(ports, done, results), daemon=True).start()
+        deadline = time.monotonic() + USB_PORT_PROBE_TIMEOUT_S
+        try:
+            for _ in ports:
+                i, error = results.get(timeout=max(0, deadline - time.monotonic()))
+                if error is None:
+                    print(f"Success connecting via USB controller {i}")
+                    break
+                print(f"USB controller {i} failed: {error}")
+        except queue.Empty:
+            print(f"No USB controller responded within {USB_PORT_PROBE_TIMEOUT_S} s")
+        finally:
+            # Stop the worker before its next probe
+            done.set()
     except Exception as e:
         print(f"Error in specific attributes method: {e}")
     
@@ -6,17 +6,19 @@
 ###############################################
 
 import pyrealsense2 as rs
+from realsense_common import get_devices
 import numpy as np
 import cv2
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Configure depth and color streams
 pipeline = rs.pipeline()
 config = rs.config()
 
 # Try to find any connected device
-ctx = rs.context()
-devices = ctx.query_devices()
+devices = get_devices()
 if len(devices) == 0:
     print("No Intel RealSense devices connected!")
     exit(0)
@@ -31,17 +33,13 @@ for i, dev in enumerate(devices):
 # You can uncomment and modify this line to connect to a specific device by serial number
 # config.enable_device('YOUR_CAMERA_SERIAL_NUMBER')
 
-# Get device product line for setting a supporting resolution
-pipeline_wrapper = rs.pipeline_wrapper(pipeline)
-pipeline_profile = config.resolve(pipeline_wrapper)
-device = pipeline_profile.get_device()
+# Get device product line for setting a supporting resolution straight from
+# the enumerated device instead of resolving the pipeline a second time
+device = devices[0]
 device_product_line = str(device.get_info(rs.camera_info.product_line))
+config.enable_device(device.get_info(rs.camera_info.serial_number))
 
-found_rgb = False
-for s in device.sensors:
-    if s.get_info(rs.camera_info.name) == 'RGB Camera':
-        found_rgb = True
-        break
+found_rgb = any(s.get_info(rs.camera_info.name) == 'RGB Camera' for s in device.sensors)
 if not found_rgb:
     print("The demo requires Depth camera with Color sensor")
     exit(0)
@@ -49,38 +47,47 @@ if not found_rgb:
 config.enable_stream(rs.stream.depth, 640, 480, rs.format.z16, 30)
 config.enable_stream(rs.stream.color, 640, 480, rs.format.bgr8, 30)
 
-# Start streaming
-pipeline.start(config)
+# Start streaming into a small queue filled by the SDK's own thread, so
+# capture overlaps with converting and displaying the previous frame
+frame_queue = rs.frame_queue(8)
+pipeline.start(config, frame_queue)
 
 # Directory to save images
 save_dir = "saved_images"
 if not os.path.exists(save_dir):
     os.makedirs(save_dir)
 
+# Encode and write saved images off the display loop
+saver = ThreadPoolExecutor(max_workers=1)
+
+def save_image(filename, image):
+    """Write an image to disk (runs on the saver thread)."""
+    cv2.imwrite(filename, image, [cv2.IMWRITE_JPEG_QUALITY, 90])
+    print(f"Image saved to {filename}")
+
 def create_color_scale_bar(height, max_distance_cm=100):
     """Create a vertical color scale bar."""
     scale_bar_width = 50
-    scale_bar = np.zeros((height, scale_bar_width), dtype=np.uint8)
 
-    # Create the grayscale scale bar
-    for i in range(height):
-        intensity = 255 - int(255 * (i / height))
-        scale_bar[i, :] = intensity
+    # Create the grayscale scale bar (one column gradient broadcast across the width)
+    gradient = np.linspace(255, 0, height, dtype=np.uint8)[:, None]
+    scale_bar = np.broadcast_to(gradient, (height, scale_bar_width)).copy()
 
-    # Add text labels to the scale bar
+    # Render all text labels into one strip, then OR it onto the gradient in a single pass
+    labels = np.zeros_like(scale_bar)
     step = height // 10
     for i in range(0, height, step):
         distance_cm = int((1 - i / height) * max_distance_cm)
-        cv2.putText(scale_bar, f"{distance_cm} cm", (5, i + 15), cv2.FONT_HERSHEY_SIMPLEX, 0.4, 255, 1)
+        cv2.putText(labels, f"{distance_cm} cm", (5, i + 15), cv2.FONT_HERSHEY_SIMPLEX, 0.4, 255, 1)
 
-    return scale_bar
+    return cv2.bitwise_or(scale_bar, labels)
 
 try:
     print("Starting camera stream...")
     
     # Wait for a coherent pair of frames to get dimensions
     try:
-        frames = pipeline.wait_for_frames(5000)  # 5 second timeout
+        frames = frame_queue.wait_for_frame(5000).as_frameset()  # 5 second timeout
         depth_frame = frames.get_depth_frame()
         color_frame = frames.get_color_frame()
         if not depth_frame or not color_frame:
@@ -91,56 +98,71 @@ try:
         raise RuntimeError("Failed to get frames from the camera. Check connections and try again.")
 
     # Get frame dimensions
-    depth_colormap_dim = np.asanyarray(depth_frame.get_data()).shape
-    color_colormap_dim = np.asanyarray(color_frame.get_data()).shape
-    if depth_colormap_dim != color_colormap_dim:
-        height, _ = depth_colormap_dim
-    else:
-        height, _ = color_colormap_dim
+    height, width = depth_frame.get_height(), depth_frame.get_width()
+    color_height, color_width = color_frame.get_height(), color_frame.get_width()
 
     # Create the color scale bar once
     color_scale_bar = create_color_scale_bar(height)
+    color_scale_bar_bgr = cv2.cvtColor(color_scale_bar, cv2.COLOR_GRAY2BGR)
+
+    # Allocate the display buffers once and fill them in place every frame:
+    # [ color | depth (gray as BGR) | scale bar ]
+    depth_gray = np.empty((height, width), dtype=np.uint8)
+    depth_bgr = np.empty((height, width, 3), dtype=np.uint8)
+    images_with_scale = np.empty((height, 2 * width + color_scale_bar.shape[1], 3), dtype=np.uint8)
+
+    # Add grayscale scale to the depth image; it never changes, so draw it once
+    images_with_scale[:, 2 * width:] = color_scale_bar_bgr
+
+    # The stream resolutions are fixed once the pipeline is running, so decide
+    # up front whether the color image has to be resized to match the depth image
+    color_view = images_with_scale[:, :width]
+    if (color_height, color_width) != (height, width):
+        resized_color_image = np.empty((height, width, 3), dtype=np.uint8)
+
+        def compose_color(color_image):
+            cv2.resize(color_image, dsize=(width, height), dst=resized_color_image, interpolation=cv2.INTER_AREA)
+            color_view[...] = resized_color_image
+    else:
+        def compose_color(color_image):
+            color_view[...] = color_image
+
+    cv2.namedWindow('RealSense', cv2.WINDOW_AUTOSIZE)
 
     while True:
         # Wait for a coherent pair of frames: depth and color
-        frames = pipeline.wait_for_frames()
+        frames = frame_queue.wait_for_frame().as_frameset()
         depth_frame = frames.get_depth_frame()
         color_frame = frames.get_color_frame()
         if not depth_frame or not color_frame:
             continue
 
-        # Convert images to numpy arrays
-        depth_image = np.asanyarray(depth_frame.get_data())
-        color_image = np.asanyarray(color_frame.get_data())
+        # Wrap the frame buffers as numpy arrays (zero-copy views)
+        depth_image = np.frombuffer(depth_frame.get_data(), dtype=np.uint16).reshape(height, width)
+        color_image = np.frombuffer(color_frame.get_data(), dtype=np.uint8).reshape(color_height, color_width, 3)
 
         # Convert depth image to grayscale (8-bit)
-        depth_gray = cv2.convertScaleAbs(depth_image, alpha=0.03)
-
-        # If depth and color resolutions are different, resize color image to match depth image for display
-        if depth_gray.shape != color_image.shape[:2]:
-            resized_color_image = cv2.resize(color_image, dsize=(depth_gray.shape[1], depth_gray.shape[0]), interpolation=cv2.INTER_AREA)
-            images = np.hstack((resized_color_image, cv2.cvtColor(depth_gray, cv2.COLOR_GRAY2BGR)))
-        else:
-            images = np.hstack((color_image, cv2.cvtColor(depth_gray, cv2.COLOR_GRAY2BGR)))
+        cv2.convertScaleAbs(depth_image, depth_gray, 0.03, 0)
 
-        # Add grayscale scale to the depth image
-        color_scale_bar_bgr = cv2.cvtColor(color_scale_bar, cv2.COLOR_GRAY2BGR)
-        images_with_scale = np.hstack((images, color_scale_bar_bgr))
+        # Copy the color image into the display buffer (resized if needed)
+        compose_color(color_image)
+        depth_bgr[..., 0] = depth_bgr[..., 1] = depth_bgr[..., 2] = depth_gray
+        images_with_scale[:, width:2 * width] = depth_bgr
 
         # Show images
-        cv2.namedWindow('RealSense', cv2.WINDOW_AUTOSIZE)
         cv2.imshow('RealSense', images_with_scale)
         key = cv2.waitKey(1)
         # Press 's' to save the image
         if key & 0xFF == ord('s'):
-            filename = os.path.join(save_dir, f"image_{int(cv2.getTickCount())}.png")
-            cv2.imwrite(filename, images_with_scale)
-            print(f"Image saved to {filename}")
+            filename = os.path.join(save_dir, f"image_{time.monotonic_ns()}.jpg")
+            # Copy since images_with_scale is overwritten by the next frame
+            saver.submit(save_image, filename, images_with_scale.copy())
         # Press esc or 'q' to close the image window
         elif key & 0xFF == ord('q') or key == 27:
             cv2.destroyAllWindows()
             break
 
 finally:
-    # Stop streaming
-    pipeline.stop()
\ No newline at end of file
+    # Stop streaming and let any pending saves finish
+    pipeline.stop()
+    saver.shutdown(wait=True)
\ No newline at end of file
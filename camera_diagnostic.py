@@ -6,11 +6,19 @@
 ###############################################
 
 import pyrealsense2 as rs
+from realsense_common import get_devices
 import sys
-import time
 import os
 import platform
+import functools
+from collections import defaultdict
 
+# Enum value -> short name lookups for printing stream profiles
+_STREAM_NAME = {int(v): k for k, v in rs.stream.__members__.items()}
+_FORMAT_NAME = {int(v): k for k, v in rs.format.__members__.items()}
+
+# The system information can't change while the process runs
+@functools.lru_cache(maxsize=1)
 def get_system_info():
     info = {}
     info["Platform"] = platform.platform()
@@ -35,10 +43,9 @@ def main():
 
     # Create a context object to manage RealSense devices
     print("Looking for RealSense devices...")
-    ctx = rs.context()
     
     # Check if any devices are connected
-    devices = ctx.query_devices()
+    devices = get_devices()
     device_count = len(devices)
     
     if device_count == 0:
@@ -81,19 +88,17 @@ def main():
                 print(f"      Supported profiles: {len(profiles)}")
                 
                 # Group profiles by stream type
-                stream_types = {}
+                stream_types = defaultdict(list)
                 for profile in profiles:
-                    stream_name = str(profile.stream_type()).split('.')[-1]
-                    if stream_name not in stream_types:
-                        stream_types[stream_name] = []
+                    modes = stream_types[_STREAM_NAME[int(profile.stream_type())]]
                     
                     # For video streams, get resolution and format
                     if profile.is_video_stream_profile():
                         video_profile = profile.as_video_stream_profile()
                         width, height = video_profile.width(), video_profile.height()
                         fps = profile.fps()
-                        format_name = str(profile.format()).split('.')[-1]
-                        stream_types[stream_name].append(f"{width}x{height} {format_name} {fps}fps")
+                        format_name = _FORMAT_NAME[int(profile.format())]
+                        modes.append(f"{width}x{height} {format_name} {fps}fps")
                 
                 # Print grouped profiles
                 for stream_name, details in stream_types.items():
@@ -131,7 +136,10 @@ def main():
             config.enable_stream(rs.stream.color, 640, 480, rs.format.bgr8, 30)
             
             print("Starting stream...")
-            profile = pipeline.start(config)
+            # Let the SDK push frames into a queue so collecting them doesn't
+            # block on the device between reads
+            frame_queue = rs.frame_queue(16, keep_frames=False)
+            profile = pipeline.start(config, frame_queue)
             print("Pipeline started successfully!")
             
             # Get device info from the active profile
@@ -143,7 +151,7 @@ def main():
             for i in range(5):
                 print(f"  Frame {i+1}/5...")
                 try:
-                    frames = pipeline.wait_for_frames(1000)  # 1 second timeout
+                    frames = frame_queue.wait_for_frame(1000).as_frameset()  # 1 second timeout
                     depth = frames.get_depth_frame()
                     color = frames.get_color_frame()
                     
@@ -160,8 +168,6 @@ def main():
                 except Exception as e:
                     print(f"  Error waiting for frame: {str(e)}")
                 
-                time.sleep(0.5)
-                
             print("\nStream test PASSED! Your camera is working correctly.")
             
         except Exception as e:
@@ -6,6 +6,7 @@
 ###############################################
 
 import pyrealsense2 as rs
+from realsense_common import get_devices
 import numpy as np
 import cv2
 import time
@@ -24,13 +25,13 @@ def main():
     print_section("APPROACH 1: CUSTOM CONFIG OPTIONS")
     
     # Configure depth and color streams with more explicit options
+    started = False
     try:
         pipeline = rs.pipeline()
         config = rs.config()
         
         # Get device product line for setting a supporting resolution
-        ctx = rs.context()
-        devices = ctx.query_devices()
+        devices = get_devices()
         
         if len(devices) == 0:
             print("No devices detected by context.query_devices()")
@@ -66,6 +67,7 @@ def main():
         # Try to start streaming with generous timeout
         print("Starting pipeline with custom configuration...")
         profile = pipeline.start(config)
+        started = True
         print("Pipeline started successfully!")
         
         # Get device info from the active profile
@@ -75,14 +77,14 @@ def main():
         
         # Wait for a coherent pair of frames
         print("Waiting for frames...")
-        tries = 0
-        max_tries = 5
-        while tries < max_tries:
-            tries += 1
-            print(f"Attempt {tries}/{max_tries}...")
+        # Give the first wait time for the stream to come up; if that times out
+        # the device state doesn't change, so later retries only need a short wait
+        frame_timeouts_ms = [5000, 1500, 1500]
+        for tries, timeout_ms in enumerate(frame_timeouts_ms, start=1):
+            print(f"Attempt {tries}/{len(frame_timeouts_ms)}...")
             
             try:
-                frames = pipeline.wait_for_frames(timeout_ms=5000)  # 5 second timeout
+                frames = pipeline.wait_for_frames(timeout_ms=timeout_ms)
                 depth_frame = frames.get_depth_frame()
                 color_frame = frames.get_color_frame()
                 
@@ -90,35 +92,32 @@ def main():
                     print("Successfully received frames!")
                     
                     # Save a sample image to verify
-                    color_image = np.asanyarray(color_frame.get_data())
+                    color_image = np.frombuffer(color_frame.get_data(), dtype=np.uint8).reshape(color_frame.get_height(), color_frame.get_width(), 3)
                     filename = os.path.join("saved_images", f"test_connection_{int(time.time())}.jpg")
                     cv2.imwrite(filename, color_image)
                     print(f"Saved test image to {filename}")
                     
                     # Show success and clean up
                     print("\n✅ CONNECTION SUCCESSFUL! Your camera is working!")
-                    pipeline.stop()
                     return True
                 else:
                     print("Missing frames, retrying...")
             except Exception as e:
                 print(f"Error waiting for frames: {e}")
-            
-            time.sleep(1)
         
         print("❌ Failed to get frames after multiple attempts")
-        pipeline.stop()
         
     except Exception as e:
         print(f"❌ Connection failed: {e}")
-        try:
+    finally:
+        # Only stop a pipeline that actually started
+        if started:
             pipeline.stop()
-        except:
-            pass
     
     # Second approach: Try with minimal configuration
     print_section("APPROACH 2: MINIMAL CONFIGURATION")
     
+    started = False
     try:
         pipeline = rs.pipeline()
         config = rs.config()
@@ -128,22 +127,21 @@ def main():
         
         print("Starting pipeline with minimal configuration...")
         profile = pipeline.start(config)
+        started = True
         print("Pipeline started successfully!")
         
         print("Waiting for frames...")
         frames = pipeline.wait_for_frames(timeout_ms=5000)
         print("Got frames!")
         
-        pipeline.stop()
         print("\n✅ MINIMAL CONFIGURATION WORKED!")
         return True
         
     except Exception as e:
         print(f"❌ Minimal configuration failed: {e}")
-        try:
+    finally:
+        if started:
             pipeline.stop()
-        except:
-            pass
     
     # Third approach: Try disabling USB power management
     print_section("APPROACH 3: USB POWER MANAGEMENT")
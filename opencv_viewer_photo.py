@@ -8,6 +8,7 @@
 import pyrealsense2 as rs
 import numpy as np
 import cv2
+from realsense_common import create_depth_colormap_lut
 
 # Configure depth and color streams
 pipeline = rs.pipeline()
@@ -56,6 +57,9 @@ def add_color_scale_bar(image, max_distance_cm=100):
 
     return combined_image
 
+# Precompute the depth colormap once
+depth_colormap_lut = create_depth_colormap_lut()
+
 try:
     while True:
         # Wait for a coherent pair of frames: depth and color
@@ -69,8 +73,8 @@ try:
         depth_image = np.asanyarray(depth_frame.get_data())
         color_image = np.asanyarray(color_frame.get_data())
 
-        # Apply colormap on depth image (image must be converted to 8-bit per pixel first)
-        depth_colormap = cv2.applyColorMap(cv2.convertScaleAbs(depth_image, alpha=0.03), cv2.COLORMAP_JET)
+        # Apply colormap on depth image via the precomputed lookup table
+        depth_colormap = depth_colormap_lut[depth_image]
 
         depth_colormap_dim = depth_colormap.shape
         color_colormap_dim = color_image.shape
@@ -6,6 +6,7 @@
 ###############################################
 
 import pyrealsense2 as rs
+from realsense_common import get_devices, create_depth_colormap_lut
 import numpy as np
 import cv2
 import time
@@ -17,38 +18,28 @@ pipeline = rs.pipeline()
 config = rs.config()
 
 # Try to find any available camera
-ctx = rs.context()
-devices = ctx.query_devices()
+devices = get_devices()
 if len(devices) == 0:
-    print("No RealSense devices detected! Trying alternative methods...")
-    
-    # Print all available cameras from system
-    print("System detected cameras:")
-    for c in ctx.devices:
-        print(f" - {c.get_info(rs.camera_info.name)} (Serial: {c.get_info(rs.camera_info.serial_number)})")
-    
-    # Try using specific device by serial - replace with your device's serial if known
-    # The serial number can be found in the Device Manager properties
-    # Or try one of the IDs from your screenshot: 6&1758D7C... or 6&1CF34A1...
+    print("No RealSense devices detected! Check drivers, cable, and USB port.")
+    exit(0)
+
+# Pin the config to the first enumerated device that resolves, using the
+# serials we already have instead of guessing device IDs
+device = None
+for serial in [d.get_info(rs.camera_info.serial_number) for d in devices]:
     try:
-        config.enable_device("6&1758D7C")  # Try the first ID from your screenshot
-    except Exception as e1:
-        try:
-            config.enable_device("6&1CF34A1")  # Try the second ID from your screenshot
-        except Exception as e2:
-            print(f"Could not enable specific device: {e1}, {e2}")
-
-# Now try to proceed normally
-try:
-    # Get device product line for setting a supporting resolution
-    pipeline_wrapper = rs.pipeline_wrapper(pipeline)
-    pipeline_profile = config.resolve(pipeline_wrapper)
-    device = pipeline_profile.get_device()
-    device_product_line = str(device.get_info(rs.camera_info.product_line))
-    print(f"Connected to {device_product_line}")
-except Exception as e:
-    print(f"Error resolving pipeline: {e}")
-    print("Continuing with default configuration...")
+        config.enable_device(serial)
+        # Get device product line for setting a supporting resolution
+        pipeline_profile = config.resolve(rs.pipeline_wrapper(pipeline))
+        device = pipeline_profile.get_device()
+        device_product_line = str(device.get_info(rs.camera_info.product_line))
+        print(f"Connected to {device_product_line} (Serial: {serial})")
+        break
+    except Exception as e:
+        print(f"Error resolving pipeline for device {serial}: {e}")
+if device is None:
+    print("Could not connect to any RealSense device")
+    exit(1)
 
 found_rgb = False
 for s in device.sensors:
@@ -60,7 +51,9 @@ if not found_rgb:
     exit(0)
 
 config.enable_stream(rs.stream.depth, 640, 480, rs.format.z16, 30)
-config.enable_stream(rs.stream.color, 640, 480, rs.format.bgr8, 30)
+# Stream color as YUYV (2 bytes per pixel instead of 3) and only convert it
+# to BGR when a photo is actually taken
+config.enable_stream(rs.stream.color, 640, 480, rs.format.yuyv, 30)
 
 # Start streaming
 print("Starting camera stream...")
@@ -71,48 +64,67 @@ except Exception as e:
     print(f"Error starting pipeline: {e}")
     exit(1)
 
+# Precompute the depth colormap once
+depth_colormap_lut = create_depth_colormap_lut()
+
 try:
     print("Waiting for frames...")
+    cv2.namedWindow('RealSense', cv2.WINDOW_AUTOSIZE)
+
+    # Only grab and render a frame when a new photo is wanted; in between we
+    # sleep in waitKey(0) and leave the last photo on screen
+    take_photo = True
+    images = None
     while True:
-        # Wait for a coherent pair of frames: depth and color
-        try:
-            frames = pipeline.wait_for_frames(5000)  # 5 second timeout
-            depth_frame = frames.get_depth_frame()
-            color_frame = frames.get_color_frame()
-            if not depth_frame or not color_frame:
-                print("Missing frames, retrying...")
+        if take_photo:
+            # Wait for a coherent pair of frames: depth and color
+            try:
+                frames = pipeline.wait_for_frames(5000)  # 5 second timeout
+                depth_frame = frames.get_depth_frame()
+                color_frame = frames.get_color_frame()
+                if not depth_frame or not color_frame:
+                    print("Missing frames, retrying...")
+                    continue
+            except Exception as e:
+                print(f"Error getting frames: {e}")
+                time.sleep(1)
                 continue
-        except Exception as e:
-            print(f"Error getting frames: {e}")
-            time.sleep(1)
-            continue
-
-        # Convert images to numpy arrays
-        depth_image = np.asanyarray(depth_frame.get_data())
-        color_image = np.asanyarray(color_frame.get_data())
-
-        # Apply colormap on depth image (image must be converted to 8-bit per pixel first)
-        depth_colormap = cv2.applyColorMap(cv2.convertScaleAbs(depth_image, alpha=0.03), cv2.COLORMAP_JET)
-
-        depth_colormap_dim = depth_colormap.shape
-        color_colormap_dim = color_image.shape
-
-        # If depth and color resolutions are different, resize color image to match depth image for display
-        if depth_colormap_dim != color_colormap_dim:
-            resized_color_image = cv2.resize(color_image, dsize=(depth_colormap_dim[1], depth_colormap_dim[0]), interpolation=cv2.INTER_AREA)
-            images = np.hstack((resized_color_image, depth_colormap))
-        else:
-            images = np.hstack((color_image, depth_colormap))
-
-        # Show images
-        cv2.namedWindow('RealSense', cv2.WINDOW_AUTOSIZE)
-        cv2.imshow('RealSense', images)
-        
+
+            # Wrap the frame buffers as numpy arrays (zero-copy views)
+            depth_image = np.frombuffer(depth_frame.get_data(), dtype=np.uint16).reshape(depth_frame.get_height(), depth_frame.get_width())
+            color_yuyv = np.frombuffer(color_frame.get_data(), dtype=np.uint8).reshape(color_frame.get_height(), color_frame.get_width(), 2)
+            color_image = cv2.cvtColor(color_yuyv, cv2.COLOR_YUV2BGR_YUYV)
+
+            # Apply colormap on depth image via the precomputed lookup table
+            depth_colormap = depth_colormap_lut[depth_image]
+
+            depth_colormap_dim = depth_colormap.shape
+            color_colormap_dim = color_image.shape
+
+            # Allocate the side-by-side display buffer on the first photo and reuse it after
+            height, width = depth_colormap_dim[:2]
+            if images is None:
+                images = np.empty((height, 2 * width, 3), dtype=np.uint8)
+
+            # If depth and color resolutions are different, resize color image to match depth image for display
+            if depth_colormap_dim != color_colormap_dim:
+                images[:, :width] = cv2.resize(color_image, dsize=(width, height), interpolation=cv2.INTER_AREA)
+            else:
+                images[:, :width] = color_image
+            images[:, width:] = depth_colormap
+
+            # Show images
+            cv2.imshow('RealSense', images)
+            take_photo = False
+
+        # Every path that reaches here has just shown a photo, so block until a key is pressed
         key = cv2.waitKey(0) & 0xFF
         if key == ord('q') or key == 27:  # Press 'q' or ESC to close the window
             break
-        elif key == ord('n'):  # Press 'n' to retake the photo
-            continue
+        elif key == 0xFF:  # waitKey(0) only returns -1 once the window is gone
+            break
+        elif key != 0xFF:  # Press 'n' (or any other key) to retake the photo
+            take_photo = True
 
     cv2.destroyAllWindows()
 
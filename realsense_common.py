@@ -0,0 +1,50 @@
+## License: Apache 2.0. See LICENSE file in root directory.
+## Copyright(c) 2015-2017 Intel Corporation. All Rights Reserved.
+
+###############################################
+##      Shared RealSense Helpers             ##
+###############################################
+
+import pyrealsense2 as rs
+import time
+
+# Creating a context walks the USB topology, so every script shares one
+_ctx = None
+
+# Device enumeration also walks the USB bus, so reuse the result for a few seconds
+_device_cache = {"t": 0.0, "devs": None}
+
+_first_serial = None
+
+def get_context():
+    """Return the process-wide RealSense context, creating it on first use"""
+    global _ctx
+    if _ctx is None:
+        _ctx = rs.context()
+    return _ctx
+
+def get_devices(ttl=3.0):
+    """Return the connected RealSense devices, re-enumerating at most every `ttl` seconds"""
+    now = time.monotonic()
+    if _device_cache["devs"] is None or now - _device_cache["t"] > ttl:
+        _device_cache.update(t=now, devs=list(get_context().query_devices()))
+    return _device_cache["devs"]
+
+def get_first_serial():
+    """Return the serial number of the first connected device, or None if there is none"""
+    global _first_serial
+    if _first_serial is None:
+        devices = get_devices()
+        if len(devices) == 0:
+            return None
+        _first_serial = devices[0].get_info(rs.camera_info.serial_number)
+    return _first_serial
+
+def create_depth_colormap_lut(alpha=0.03):
+    """Build a 16-bit depth -> BGR JET lookup table (same as convertScaleAbs + applyColorMap)."""
+    # Imported here so the diagnostic scripts only need pyrealsense2
+    import numpy as np
+    import cv2
+
+    scaled = np.clip(np.rint(np.arange(65536) * alpha), 0, 255).astype(np.uint8)
+    return cv2.applyColorMap(scaled.reshape(-1, 1), cv2.COLORMAP_JET).reshape(-1, 3)
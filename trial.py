@@ -1,7 +1,7 @@
 import pyrealsense2 as rs
+from realsense_common import get_devices
 
-ctx = rs.context()
-devices = ctx.query_devices()
+devices = get_devices()
 
 if not devices:
     print("❌ No RealSense devices detected. Check drivers, cable, and USB port.")
@@ -6,7 +6,6 @@
 ###############################################
 
 import sys
-import time
 import os
 import subprocess
 import platform
@@ -21,45 +20,40 @@ def print_section(text):
     print(text)
     print("-" * 40)
 
-def run_command(command):
+def run_command(command, timeout=30):
     """Run a command and return the output"""
     try:
-        result = subprocess.run(command, shell=True, capture_output=True, text=True, timeout=30)
+        result = subprocess.run(command, shell=True, capture_output=True, text=True, timeout=timeout)
         return result.stdout
     except Exception as e:
         return f"Error running command: {e}"
 
+def run_powershell(statements, timeout=30):
+    """Run several PowerShell statements in a single process and return the output"""
+    # One process for all statements so PowerShell's startup cost is paid once
+    return run_command('powershell -NoProfile -NonInteractive -Command "' + '; '.join(statements) + '"', timeout=timeout)
+
 def reset_usb_devices_windows():
     """Reset USB devices on Windows"""
     print_section("RESETTING USB DEVICES")
     
-    # First, get a list of all USB devices
-    print("Listing USB devices...")
-    output = run_command('powershell -Command "Get-PnpDevice | Where-Object {$_.Class -eq \'USB\' -or $_.Class -eq \'Camera\'} | Format-Table -AutoSize"')
-    print(output)
-    
-    # Look specifically for Intel RealSense devices
-    print("\nLooking for Intel RealSense devices...")
-    output = run_command('powershell -Command "Get-PnpDevice | Where-Object {$_.FriendlyName -like \'*Intel*\' -or $_.FriendlyName -like \'*RealSense*\'} | Format-Table -AutoSize"')
-    print(output)
-    
-    # Try to disable and re-enable the device if found
-    print("\nAttempting to reset RealSense devices...")
-    
-    # This command will disable any device with "RealSense" in the name
-    disable_cmd = 'powershell -Command "Get-PnpDevice | Where-Object {$_.FriendlyName -like \'*RealSense*\'} | Disable-PnpDevice -Confirm:$false"'
-    print("Disabling RealSense devices...")
-    output = run_command(disable_cmd)
-    print(output)
-    
-    # Wait a moment
-    print("Waiting 5 seconds...")
-    time.sleep(5)
-    
-    # This command will re-enable any device with "RealSense" in the name
-    enable_cmd = 'powershell -Command "Get-PnpDevice | Where-Object {$_.FriendlyName -like \'*RealSense*\'} | Enable-PnpDevice -Confirm:$false"'
-    print("Re-enabling RealSense devices...")
-    output = run_command(enable_cmd)
+    # List the devices, then disable and re-enable any device with "RealSense"
+    # in the name, all from one PowerShell session that enumerates devices once
+    print("Listing devices and resetting RealSense devices (this takes a few seconds)...")
+    output = run_powershell([
+        "$all = Get-PnpDevice",
+        "'Listing USB devices...'",
+        "$all | Where-Object {$_.Class -eq 'USB' -or $_.Class -eq 'Camera'} | Format-Table -AutoSize | Out-String",
+        "'Looking for Intel RealSense devices...'",
+        "$all | Where-Object {$_.FriendlyName -like '*Intel*' -or $_.FriendlyName -like '*RealSense*'} | Format-Table -AutoSize | Out-String",
+        "$d = $all | Where-Object {$_.FriendlyName -like '*RealSense*'}",
+        "'Disabling RealSense devices...'",
+        "$d | Disable-PnpDevice -Confirm:$false",
+        "'Waiting 5 seconds...'",
+        "Start-Sleep 5",
+        "'Re-enabling RealSense devices...'",
+        "$d | Enable-PnpDevice -Confirm:$false",
+    ], timeout=60)
     print(output)
     
     print("\nUSB reset procedure completed. Please check if your device is now working.")
@@ -68,14 +62,13 @@ def check_driver_status_windows():
     """Check driver status on Windows"""
     print_section("CHECKING DRIVER STATUS")
     
-    # Check for Intel RealSense drivers
-    print("Looking for Intel RealSense drivers...")
-    output = run_command('powershell -Command "Get-WmiObject Win32_PnPSignedDriver | Where-Object {$_.DeviceName -like \'*Intel*\' -or $_.DeviceName -like \'*RealSense*\'} | Select-Object DeviceName, DriverVersion, DriverDate | Format-Table -AutoSize"')
-    print(output)
-    
-    # Check for issues in device manager
-    print("\nChecking for device issues...")
-    output = run_command('powershell -Command "Get-PnpDevice | Where-Object {$_.Status -ne \'OK\'} | Format-Table -AutoSize"')
+    # Check for Intel RealSense drivers and for issues in device manager
+    output = run_powershell([
+        "'Looking for Intel RealSense drivers...'",
+        "Get-WmiObject Win32_PnPSignedDriver | Where-Object {$_.DeviceName -like '*Intel*' -or $_.DeviceName -like '*RealSense*'} | Select-Object DeviceName, DriverVersion, DriverDate | Format-Table -AutoSize | Out-String",
+        "'Checking for device issues...'",
+        "Get-PnpDevice | Where-Object {$_.Status -ne 'OK'} | Format-Table -AutoSize | Out-String",
+    ])
     print(output)
 
 def recommend_fixes():
@@ -6,19 +6,26 @@
 ###############################################
 
 import pyrealsense2 as rs
+from realsense_common import get_devices, create_depth_colormap_lut
 import numpy as np
 import cv2
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Configure depth and color streams
 pipeline = rs.pipeline()
 config = rs.config()
 
-# Get device product line for setting a supporting resolution
-pipeline_wrapper = rs.pipeline_wrapper(pipeline)
-pipeline_profile = config.resolve(pipeline_wrapper)
-device = pipeline_profile.get_device()
+# Get device product line for setting a supporting resolution from the first
+# enumerated device, and pin the config to it so the pipeline isn't resolved twice
+devices = get_devices()
+if len(devices) == 0:
+    print("No Intel RealSense devices connected!")
+    exit(0)
+device = devices[0]
 device_product_line = str(device.get_info(rs.camera_info.product_line))
+config.enable_device(device.get_info(rs.camera_info.serial_number))
 
 found_rgb = False
 for s in device.sensors:
@@ -40,23 +47,35 @@ save_dir = "saved_images"
 if not os.path.exists(save_dir):
     os.makedirs(save_dir)
 
+# Encode and write saved images off the capture loop
+save_pool = ThreadPoolExecutor(max_workers=2)
+
+def save_image(filename, image):
+    """Write an image to disk (runs on a save_pool thread)."""
+    # Favour encode speed over file size: skip zlib compression entirely
+    cv2.imwrite(filename, image, [cv2.IMWRITE_PNG_COMPRESSION, 0, cv2.IMWRITE_PNG_STRATEGY, cv2.IMWRITE_PNG_STRATEGY_RLE])
+    print(f"Image saved to {filename}")
+
 def create_color_scale_bar(height, max_distance_cm=100):
     """Create a vertical color scale bar."""
     scale_bar_width = 50
-    scale_bar = np.zeros((height, scale_bar_width, 3), dtype=np.uint8)
 
-    # Create the color scale bar
-    for i in range(height):
-        color = cv2.applyColorMap(np.array([[255 - int(255 * (i / height))]], dtype=np.uint8), cv2.COLORMAP_JET)[0][0]
-        scale_bar[i, :] = color
+    # Create the color scale bar (colormap one column in a single call, then broadcast it across the width)
+    ramp = (255 - np.arange(height) * 255 // height).astype(np.uint8).reshape(-1, 1)
+    column = cv2.applyColorMap(ramp, cv2.COLORMAP_JET).reshape(height, 1, 3)
+    scale_bar = np.broadcast_to(column, (height, scale_bar_width, 3)).copy()
 
-    # Add text labels to the scale bar
+    # Render all text labels into one strip, then OR it onto the gradient in a single pass
+    labels = np.zeros_like(scale_bar)
     step = height // 10
     for i in range(0, height, step):
         distance_cm = int((1 - i / height) * max_distance_cm)
-        cv2.putText(scale_bar, f"{distance_cm} cm", (5, i + 15), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
+        cv2.putText(labels, f"{distance_cm} cm", (5, i + 15), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
 
-    return scale_bar
+    return cv2.bitwise_or(scale_bar, labels)
+
+# Precompute the depth colormap once
+depth_colormap_lut = create_depth_colormap_lut()
 
 try:
     # Wait for a coherent pair of frames to get dimensions
@@ -67,55 +86,78 @@ try:
         raise RuntimeError("Could not get frames from the camera")
 
     # Get frame dimensions
-    depth_colormap_dim = np.asanyarray(depth_frame.get_data()).shape
-    color_colormap_dim = np.asanyarray(color_frame.get_data()).shape
-    if depth_colormap_dim != color_colormap_dim:
-        height, _ = depth_colormap_dim
-    else:
-        height, _ = color_colormap_dim
+    height, width = depth_frame.get_height(), depth_frame.get_width()
 
     # Create the color scale bar once
     color_scale_bar = create_color_scale_bar(height)
 
+    # Allocate the display buffer once (blank until the first polled frame): [ color | depth colormap | scale bar ].
+    # The scale bar never changes, so it is drawn into the buffer up front.
+    images_with_scale = np.zeros((height, 2 * width + color_scale_bar.shape[1], 3), dtype=np.uint8)
+    images_with_scale[:, 2 * width:] = color_scale_bar
+
+    # Scratch buffers for the half-resolution display colormap, reused every frame
+    depth_small = np.empty((height // 2, width // 2), dtype=np.uint16)
+    small_colormap = np.empty((height // 2, width // 2, 3), dtype=np.uint8)
+    depth_colormap = np.empty((height, width, 3), dtype=np.uint8)
+
+    # Create the window once, sized to the composite, so it never has to relayout
+    cv2.namedWindow('RealSense', cv2.WINDOW_NORMAL)
+    cv2.resizeWindow('RealSense', images_with_scale.shape[1], height)
+
+    # Last displayed depth frame, kept alive so 's' can save it at full resolution
+    shown_depth_frame = None
+
     while True:
-        # Wait for a coherent pair of frames: depth and color
-        frames = pipeline.wait_for_frames()
-        depth_frame = frames.get_depth_frame()
-        color_frame = frames.get_color_frame()
-        if not depth_frame or not color_frame:
-            continue
-
-        # Convert images to numpy arrays
-        depth_image = np.asanyarray(depth_frame.get_data())
-        color_image = np.asanyarray(color_frame.get_data())
-
-        # Apply colormap on depth image (image must be converted to 8-bit per pixel first)
-        depth_colormap = cv2.applyColorMap(cv2.convertScaleAbs(depth_image, alpha=0.03), cv2.COLORMAP_JET)
-
-        # If depth and color resolutions are different, resize color image to match depth image for display
-        if depth_colormap.shape != color_image.shape:
-            resized_color_image = cv2.resize(color_image, dsize=(depth_colormap.shape[1], depth_colormap.shape[0]), interpolation=cv2.INTER_AREA)
-            images = np.hstack((resized_color_image, depth_colormap))
+        # Poll for a coherent pair of frames instead of blocking on the camera,
+        # so the window keeps handling events while the next frame arrives
+        frames = pipeline.poll_for_frames()
+        depth_frame = frames.get_depth_frame() if frames else None
+        color_frame = frames.get_color_frame() if frames else None
+        if depth_frame and color_frame:
+            # Wrap the frame buffers as numpy arrays (zero-copy views)
+            depth_image = np.frombuffer(depth_frame.get_data(), dtype=np.uint16).reshape(height, width)
+            color_image = np.frombuffer(color_frame.get_data(), dtype=np.uint8).reshape(height, width, 3)
+
+            # Apply colormap on depth image via the precomputed lookup table. For
+            # display, colormap a half-resolution copy (a quarter of the pixels)
+            # and scale it back up; saved images get the full-resolution colormap
+            cv2.resize(depth_image, (width // 2, height // 2), dst=depth_small, interpolation=cv2.INTER_NEAREST)
+            np.take(depth_colormap_lut, depth_small, axis=0, out=small_colormap)
+            cv2.resize(small_colormap, (width, height), dst=depth_colormap, interpolation=cv2.INTER_NEAREST)
+            shown_depth_frame = depth_frame
+
+            # Both streams are configured at 640x480, so no resize is needed
+            images_with_scale[:, :width] = color_image
+            images_with_scale[:, width:2 * width] = depth_colormap
+
+            # Show images
+            cv2.imshow('RealSense', images_with_scale)
         else:
-            images = np.hstack((color_image, depth_colormap))
+            # Nothing new to show yet; don't spin on poll_for_frames()
+            time.sleep(0.001)
 
-        # Add color scale to the depth image
-        images_with_scale = np.hstack((images, color_scale_bar))
-
-        # Show images
-        cv2.namedWindow('RealSense', cv2.WINDOW_AUTOSIZE)
-        cv2.imshow('RealSense', images_with_scale)
+        # Handle window events
         key = cv2.waitKey(1)
+        # Closing the window with X leaves no window to receive 'q'/ESC, and the
+        # next imshow would re-create it, so quit before drawing again
+        if cv2.getWindowProperty('RealSense', cv2.WND_PROP_VISIBLE) < 1:
+            break
         # Press 's' to save the image
         if key & 0xFF == ord('s'):
-            filename = os.path.join(save_dir, f"image_{int(cv2.getTickCount())}.png")
-            cv2.imwrite(filename, images_with_scale)
-            print(f"Image saved to {filename}")
+            filename = os.path.join(save_dir, f"image_{time.monotonic_ns()}.png")
+            # Copy since images_with_scale is overwritten by the next frame
+            snapshot = images_with_scale.copy()
+            if shown_depth_frame:
+                shown_depth = np.frombuffer(shown_depth_frame.get_data(), dtype=np.uint16).reshape(height, width)
+                snapshot[:, width:2 * width] = depth_colormap_lut[shown_depth]
+            save_pool.submit(save_image, filename, snapshot)
         # Press esc or 'q' to close the image window
         elif key & 0xFF == ord('q') or key == 27:
             cv2.destroyAllWindows()
             break
 
 finally:
-    # Stop streaming
+    # Stop streaming and let any pending saves finish
     pipeline.stop()
+    save_pool.shutdown(wait=True)